@@ -0,0 +1,66 @@
+"""
+_data.py
+Shared loader for survey_clean.csv (or its Parquet mirror).
+
+get_df() parses the cleaned survey once per Python process and hands each
+caller its own copy, so scripts run together (see run_all.py) reuse the
+parsed frame and are still free to add or convert columns.
+
+Run AFTER create_clean_csv.py
+"""
+
+import os
+from functools import lru_cache
+import pandas as pd
+
+BASE    = os.path.dirname(__file__)
+CSV     = os.path.join(BASE, "survey_clean.csv")
+PARQUET = os.path.join(BASE, "survey_clean.parquet")
+
+# ── Column types (matches the writer in create_clean_csv.py) ──────────────────
+# Every survey code fits in a byte, so the numeric columns are held as int8
+# rather than the default int64 — 8× less data through groupby / rankdata.
+# The coded answers use pandas' nullable Int8: create_clean_csv.py leaves a
+# cell blank when an answer doesn't map, and plain int8 can't hold that.
+DTYPES = {
+    "respondent_id":         "int16",
+    "site":                  str,
+    "age_group":             str,
+    "age_numeric":           "Int8",
+    "residency_duration":    str,
+    "residency_numeric":     "Int8",
+    "floor_level":           str,
+    "floor_numeric":         "Int8",
+    "Q4_noise_rating":       "Int8",
+    "Q5_noise_sources":      str,
+    "Q6_noise_spike":        "Int8",
+    "Q6_spike_raw":          str,
+    "Q7_concentration_raw":  str,
+    "Q7_concentration":      "Int8",
+    "Q8_air_quality":        "Int8",
+    "Q9_convenience_raw":    str,
+    "Q10_community_raw":     str,
+    "Q10_community":         "Int8",
+    "Q11_QoL_raw":           str,
+    "Q11_QoL":               "Int8",
+}
+
+
+@lru_cache(maxsize=1)
+def _load():
+    # create_clean_csv.py also writes a Parquet copy; reading it skips CSV
+    # tokenising and type inference.  Ignore it if the CSV has been rewritten
+    # since, if pyarrow isn't installed, or if the file can't be read
+    # (pyarrow's ArrowInvalid is a ValueError).
+    if (os.path.exists(PARQUET)
+            and os.path.getmtime(PARQUET) >= os.path.getmtime(CSV)):
+        try:
+            return pd.read_parquet(PARQUET, engine="pyarrow").astype(DTYPES)
+        except (ImportError, ValueError, OSError):
+            pass
+    return pd.read_csv(CSV, dtype=DTYPES, engine="c")
+
+
+def get_df():
+    """Return a fresh copy of the cleaned survey DataFrame."""
+    return _load().copy()
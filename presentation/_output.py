@@ -0,0 +1,36 @@
+"""
+_output.py
+Shared output helpers for analysis_final.py and analysis_focused_proof.py.
+
+Backend, output folder, CHART_DPI and the base rcParams come from _plots.py;
+this module only switches on constrained_layout and provides say()/flush()
+for buffered console output plus save() for writing a chart through
+_plots.write().
+
+Charts go to ./charts/ as PNG (CHART_DPI sets the resolution).
+"""
+
+import sys
+import matplotlib.pyplot as plt
+from _plots import write
+
+# Layout is solved once at draw time — no tight_layout() pass, no bbox re-render
+plt.rcParams["figure.constrained_layout.use"] = True
+
+# ── Console ────────────────────────────────────────────────────────────────────
+# Console lines are collected with say() and written in one call by flush(),
+# which save() runs after every chart so progress still shows between saves
+_LINES = []
+say    = _LINES.append
+
+
+def flush():
+    if _LINES:
+        sys.stdout.write("\n".join(_LINES) + "\n")
+        _LINES.clear()
+
+
+def save(name, fig):
+    write(fig, name)   # the Figure is cleared, so the next chart of this shape reuses the canvas
+    say(f"  ✓  {name}")
+    flush()
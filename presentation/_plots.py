@@ -0,0 +1,172 @@
+"""
+_plots.py
+Shared chart helpers for Scripts 1–3.
+
+One parameterised function per chart shape (pie, vbar, hbar, box, heatmap);
+each draws into a pooled Figure, saves it and returns the saved file name.
+
+Charts go to ./charts/ as SVG, or PNG with CHART_FORMAT=png (CHART_DPI sets
+the resolution).  The backend, output folder, CHART_DPI and base rcParams set
+here are also used by _output.py for analysis_final.py / focused_proof.py.
+"""
+
+import os
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")   # file output only; skip GUI backend discovery
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+
+# ── Config ─────────────────────────────────────────────────────────────────────
+BASE   = os.path.dirname(__file__)
+OUTDIR = os.path.join(BASE, "charts")
+os.makedirs(OUTDIR, exist_ok=True)
+# Vector output skips Agg rasterisation and PNG encoding; CHART_FORMAT=png for bitmaps
+CHART_FORMAT = os.environ.get("CHART_FORMAT", "svg")
+# Raster resolution for every PNG; slide-quality by default, CHART_DPI=72 for
+# quick drafts (encode time scales with pixel count)
+DPI = int(os.environ.get("CHART_DPI", "150"))
+
+plt.rcParams.update({
+    "font.family":  "DejaVu Sans",
+    "font.size":    11,
+    "axes.spines.top":   False,
+    "axes.spines.right": False,
+})
+
+# ── Figure pool ────────────────────────────────────────────────────────────────
+# One Figure per figsize, reused chart after chart — save() clears the figure
+# instead of closing it, so each canvas is only allocated once.  Each chart
+# gets a fresh Axes, so nothing a shape sets (hidden spines, pie aspect,
+# frame_on) carries over to the next chart of the same size.
+_FIG_POOL = {}
+
+
+def get_axes(figsize):
+    if figsize not in _FIG_POOL:
+        _FIG_POOL[figsize] = plt.figure(figsize=figsize)
+    fig = _FIG_POOL[figsize]
+    # Undo the previous chart's tight_layout so the new one starts from scratch
+    fig.subplotpars.reset()
+    fig.subplots_adjust()
+    ax = fig.add_subplot()
+    plt.sca(ax)
+    return ax
+
+
+def write(fig, fname):
+    """Save `fig` to ./charts/<fname>, then clear it for the next chart of its shape."""
+    # zlib level 1 encodes several times faster than the default 6, for slightly larger files
+    kwargs = {"pil_kwargs": {"compress_level": 1}} if fname.endswith(".png") else {}
+    fig.savefig(os.path.join(OUTDIR, fname), dpi=DPI, **kwargs)
+    fig.clf()
+
+
+def save(stem):
+    """Write the current chart as <stem>.<CHART_FORMAT>; returns the file name."""
+    fname = f"{stem}.{CHART_FORMAT}"
+    fig = plt.gcf()
+    fig.tight_layout()   # fits the margins, so savefig needs no bbox_inches="tight"
+    write(fig, fname)
+    print(f"  ✓ {fname}")
+    return fname
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Chart shapes
+# ══════════════════════════════════════════════════════════════════════════════
+def pie(counts, colors, title, stem, *, startangle=140, pctdistance=0.75):
+    """Pie of a value_counts() Series, with bold percentage labels."""
+    ax = get_axes((6, 6))
+    _, _, autotexts = ax.pie(
+        counts,
+        labels=counts.index,
+        autopct="%1.0f%%",
+        colors=colors,
+        startangle=startangle,
+        pctdistance=pctdistance,
+    )
+    for t in autotexts:
+        t.set_fontweight("bold")
+    ax.set_title(title, fontsize=13, fontweight="bold", pad=15)
+    return save(stem)
+
+
+def vbar(counts, color, title, stem, *, ylabel="Number of Respondents",
+         figsize=(7, 4), headroom=3, rotation=15):
+    """Vertical bar of a counts Series, each bar labelled with its value."""
+    ax = get_axes(figsize)
+    bars = ax.bar(counts.index, counts.values, color=color, edgecolor="white", width=0.55)
+    ax.bar_label(bars, padding=3, fontweight="bold")
+    ax.set_title(title, fontsize=13, fontweight="bold")
+    ax.set_ylabel(ylabel)
+    ax.set_ylim(0, counts.max() + headroom)
+    plt.setp(ax.get_xticklabels(), rotation=rotation, ha="right")
+    return save(stem)
+
+
+def hbar(counts, color, title, stem, *, xlabel="Number of Respondents", headroom=3):
+    """Horizontal bar of a counts Series, drawn bottom-up in index order."""
+    ax = get_axes((7, 4))
+    bars = ax.barh(counts.index, counts.values, color=color, edgecolor="white", height=0.55)
+    ax.bar_label(bars, padding=3, fontweight="bold")
+    ax.set_title(title, fontsize=13, fontweight="bold")
+    ax.set_xlabel(xlabel)
+    ax.set_xlim(0, counts.max() + headroom)
+    return save(stem)
+
+
+def box(groups_dict, ylabel, title, stem, color_map):
+    """Box plot of {label: values} with the raw points jittered on top."""
+    labels = list(groups_dict.keys())
+    data   = [groups_dict[k] for k in labels]
+    colors = [color_map.get(k, "#aaaaaa") for k in labels]
+
+    ax = get_axes((7, 4.5))
+    bp = ax.boxplot(data, patch_artist=True, notch=False,
+                    medianprops=dict(color="black", lw=2))
+    for patch, color in zip(bp["boxes"], colors):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.75)
+
+    # Overlay jitter — one RNG, one draw, sliced per group (re-seeding per
+    # group gave every box the same offset pattern)
+    rng    = np.random.default_rng(42)
+    sizes  = [len(d) for d in data]
+    jitter = np.split(rng.uniform(-0.15, 0.15, sum(sizes)), np.cumsum(sizes)[:-1])
+    for i, (d, color, jit) in enumerate(zip(data, colors, jitter), start=1):
+        ax.scatter(np.full(len(d), i) + jit, d,
+                   color=color, s=45, alpha=0.9, edgecolors="white", lw=0.5, zorder=3)
+
+    ax.set_xticks(range(1, len(labels) + 1))
+    ax.set_xticklabels(labels, rotation=12, ha="right", fontsize=10)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title, fontsize=12, fontweight="bold", pad=12)
+    ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+    return save(stem)
+
+
+def heatmap(ct, title, stem, xlabel, ylabel):
+    """Render a crosstab as a coloured heatmap with the counts written in."""
+    ax = get_axes((max(5, ct.shape[1] * 1.4 + 1.5),
+                   max(3, ct.shape[0] * 0.9 + 1.2)))
+    vals = ct.values
+    vmax = max(vals.max(), 1)
+
+    # Colour scale: 0 → Blues(0.2), max count → Blues(0.8)
+    ax.imshow(vals, cmap="Blues", aspect="auto",
+              vmin=-vmax / 3, vmax=vmax * 4 / 3)
+    for i, j in np.ndindex(vals.shape):
+        ax.text(j, i, vals[i, j], ha="center", va="center", fontsize=10,
+                fontweight="bold", color="white" if vals[i, j] > vmax / 2 else "black")
+
+    ax.set_xticks(range(ct.shape[1]), [str(c) for c in ct.columns])
+    ax.set_yticks(range(ct.shape[0]), [str(r) for r in ct.index])
+    ax.tick_params(length=0)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title, fontsize=12, fontweight="bold", pad=12)
+    return save(stem)
+
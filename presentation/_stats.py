@@ -0,0 +1,58 @@
+"""
+_stats.py
+Shared statistics helpers for analysis_final.py and analysis_focused_proof.py.
+
+spearman_matrix() returns every Spearman ρ and p-value for a set of columns
+from a single ranking of each column, instead of one scipy.stats.spearmanr()
+(and two rankings) per pair.  fit1() is the least-squares trend line used on
+the scatter plots.
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def spearman_matrix(df, cols):
+    """
+    Spearman ρ and two-sided p-value for every pair of `cols`.
+    Rows missing either variable are dropped pair by pair, the same as
+    spearmanr() on a per-pair dropna().
+    Returns (rho, p) as DataFrames indexed by column name on both axes.
+    """
+    sub   = df[cols]
+    vals  = sub.to_numpy(dtype=float)
+    valid = sub.notna().to_numpy()
+    full  = valid.all(axis=0)
+    ranks = sub.rank().to_numpy()     # each column ranked once
+
+    # Columns with no blanks share every row, so Pearson on their ranks is ρ
+    r = np.eye(len(cols))
+    if full.any():
+        r[np.ix_(full, full)] = np.corrcoef(ranks[:, full], rowvar=False)
+
+    # Pairs touching a column with blanks: re-rank both over the common rows
+    for i, j in itertools.combinations(range(len(cols)), 2):
+        if full[i] and full[j]:
+            continue
+        rows = valid[:, i] & valid[:, j]
+        r[i, j] = r[j, i] = np.corrcoef(stats.rankdata(vals[rows, i]),
+                                        stats.rankdata(vals[rows, j]))[0, 1]
+
+    mask = valid.astype(float)
+    dof  = mask.T @ mask - 2          # pairwise complete observations − 2
+    # Same t-approximation spearmanr() uses for its p-value
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt((dof / ((r + 1.0) * (1.0 - r))).clip(0))
+    p = 2 * stats.t.sf(np.abs(t), dof)
+    return (pd.DataFrame(r, index=cols, columns=cols),
+            pd.DataFrame(p, index=cols, columns=cols))
+
+
+def fit1(x, y):
+    """Least-squares line through (x, y); returns (slope, intercept)."""
+    xm, ym = x.mean(), y.mean()
+    dx = x - xm
+    m  = (dx * (y - ym)).sum() / (dx * dx).sum()
+    return m, ym - m * xm
@@ -0,0 +1,55 @@
+"""
+_stats_cache.py
+On-disk memo of Spearman results shared by analysis_final.py and
+analysis_focused_proof.py.
+
+cached_spearman() keys each (x, y) pair on the two column names plus an md5
+of the pair's complete rows, so editing survey_clean.csv invalidates the
+entry by itself.  Results live in spearman_cache.json next to this file;
+delete it at any time to force a recompute.
+"""
+
+import os
+import json
+import hashlib
+from _stats import spearman_matrix
+
+CACHE = os.path.join(os.path.dirname(__file__), "spearman_cache.json")
+
+
+def _key(df, x, y):
+    data = df[[x, y]].dropna().to_numpy(dtype=float)   # float64, whatever the load dtype
+    return f"{x}|{y}|{hashlib.md5(data.tobytes()).hexdigest()}"
+
+
+def _read():
+    try:
+        with open(CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_spearman(df, pairs):
+    """
+    Return {(x, y): (rho, p)} for each pair in `pairs`.
+    Pairs not yet cached are computed together in one spearman_matrix() call
+    and written back, replacing any stale entry for the same pair.
+    """
+    cache = _read()
+    keys = {(x, y): _key(df, x, y) for x, y in pairs}
+    missing = [pair for pair, k in keys.items() if k not in cache]
+
+    if missing:
+        cols = list(dict.fromkeys(c for pair in missing for c in pair))
+        rho, p = spearman_matrix(df, cols)
+        stale = {f"{x}|{y}" for x, y in missing}
+        cache = {k: v for k, v in cache.items() if k.rsplit("|", 1)[0] not in stale}
+        for x, y in missing:
+            cache[keys[x, y]] = [float(rho.loc[x, y]), float(p.loc[x, y])]
+        tmp = CACHE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp, CACHE)   # never leave a half-written cache behind
+
+    return {pair: tuple(cache[k]) for pair, k in keys.items()}
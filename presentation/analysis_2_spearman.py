@@ -10,35 +10,22 @@ Tests all 4 pairs from the problem statement:
 
 Outputs:
   - Console table with ρ, p-value, interpretation
-  - Scatter plots with Spearman ρ annotated → ./charts/spearman_*.png
+  - Scatter plots with Spearman ρ annotated → ./charts/spearman_*.svg
+    (CHART_FORMAT=png for bitmaps)
 
 Run AFTER create_clean_csv.py
 """
 
-import os
 import warnings
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+from bisect import bisect_right
 import matplotlib.ticker as ticker
-from scipy import stats
+from _data import get_df
+from _plots import get_axes, save
+from _stats import spearman_matrix, fit1
 
 warnings.filterwarnings("ignore")
 
-# ── Config ─────────────────────────────────────────────────────────────────────
-BASE   = os.path.dirname(__file__)
-CSV    = os.path.join(BASE, "survey_clean.csv")
-OUTDIR = os.path.join(BASE, "charts")
-os.makedirs(OUTDIR, exist_ok=True)
-
-df = pd.read_csv(CSV)
-
-plt.rcParams.update({
-    "font.family": "DejaVu Sans",
-    "font.size":   11,
-    "axes.spines.top":   False,
-    "axes.spines.right": False,
-})
+df = get_df()
 
 SITE_COLORS = {
     "Waterloo Centre":   "#4e79a7",
@@ -59,52 +46,59 @@ LABELS = {
 PAIRS = [
     ("Q4_noise_rating", "Q7_concentration",
      "Chain 1→2: Noise Level vs Concentration Impact",
-     "spearman_Q4_Q7.png"),
+     "spearman_Q4_Q7"),
     ("Q4_noise_rating", "Q11_QoL",
      "Chain 2→3: Noise Level vs Quality of Life",
-     "spearman_Q4_Q11.png"),
+     "spearman_Q4_Q11"),
     ("Q8_air_quality",  "Q11_QoL",
      "Supporting: Air Quality vs Quality of Life",
-     "spearman_Q8_Q11.png"),
+     "spearman_Q8_Q11"),
     ("Q4_noise_rating", "Q8_air_quality",
      "Co-location: Noise Level vs Air Quality",
-     "spearman_Q4_Q8.png"),
+     "spearman_Q4_Q8"),
 ]
 
+# Per-site rows, split once and shared by every scatter plot
+SITE_GROUPS = dict(list(df.groupby("site")))
+
+# Every variable used by PAIRS; each ranked once by spearman_matrix()
+CORR_COLS = ["Q4_noise_rating", "Q7_concentration", "Q8_air_quality", "Q11_QoL"]
+
+
+# ── Lookup tables for interpret() ─────────────────────────────────────────────
+STRENGTH_CUTS = (0.4, 0.7)                      # |ρ| ≥ cut → next label up
+STRENGTH      = ("weak", "moderate", "strong")
+SIG_TABLE     = {                               # keyed on p < 0.05
+    True:  ("statistically significant", ""),
+    False: ("not statistically significant", " (⚠ n={n}: treat as indicative)"),
+}
+
 
 def interpret(rho, p, n=20):
     """Short plain-English interpretation."""
-    sig = p < 0.05
-    if abs(rho) >= 0.7:
-        strength = "strong"
-    elif abs(rho) >= 0.4:
-        strength = "moderate"
-    else:
-        strength = "weak"
+    strength  = STRENGTH[bisect_right(STRENGTH_CUTS, abs(rho))]
     direction = "positive" if rho > 0 else "negative"
-    sig_str   = "statistically significant" if sig else "not statistically significant"
-    caveat    = f" (⚠ n={n}: treat as indicative)" if not sig else ""
-    return f"{strength} {direction} correlation, {sig_str}{caveat}"
+    sig_str, caveat = SIG_TABLE[bool(p < 0.05)]
+    return f"{strength} {direction} correlation, {sig_str}{caveat.format(n=n)}"
 
 
-def scatter_spearman(xvar, yvar, title, fname, rho, p):
-    x = df[xvar]
-    y = df[yvar]
+def scatter_spearman(xvar, yvar, title, stem, rho, p, site_groups):
+    xy = df[[xvar, yvar]].dropna().astype(float)   # the pair's complete rows
+    x, y = xy[xvar], xy[yvar]
 
-    fig, ax = plt.subplots(figsize=(6.5, 5))
+    ax = get_axes((6.5, 5))
 
-    for site, grp in df.groupby("site"):
+    for site, grp in site_groups.items():
         ax.scatter(grp[xvar], grp[yvar],
                    color=SITE_COLORS.get(site, "grey"),
                    s=70, alpha=0.85, edgecolors="white", linewidths=0.6,
                    label=site)
 
-    # Trend line
-    z   = np.polyfit(x, y, 1)
+    # Trend line — closed-form least squares; a straight line needs two points
+    slope, icept = fit1(x, y)
     xlo, xhi = x.min() - 0.3, x.max() + 0.3
-    xs  = np.linspace(xlo, xhi, 200)
-    ax.plot(xs, np.polyval(z, xs), color="#555555", lw=1.4,
-            linestyle="--", alpha=0.7)
+    ax.plot([xlo, xhi], [slope * xlo + icept, slope * xhi + icept],
+            color="#555555", lw=1.4, linestyle="--", alpha=0.7)
 
     # Annotation box
     sig_str = "p < 0.05 ✓" if p < 0.05 else f"p = {p:.3f}"
@@ -122,11 +116,7 @@ def scatter_spearman(xvar, yvar, title, fname, rho, p):
     ax.xaxis.set_major_locator(ticker.MaxNLocator(integer=True))
     ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
 
-    plt.tight_layout()
-    path = os.path.join(OUTDIR, fname)
-    plt.savefig(path, dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  ✓ {fname}")
+    save(stem)
 
 
 # ── Run all pairs ──────────────────────────────────────────────────────────────
@@ -136,24 +126,29 @@ print("=" * 65)
 print(f"{'Pair':<35} {'ρ':>7} {'p':>8}  Interpretation")
 print("-" * 90)
 
+# Pairwise deletion: each pair keeps every row where both of its variables
+# were answered, as a per-pair spearmanr() would
+RHO, P = spearman_matrix(df, CORR_COLS)
+N = df[CORR_COLS].notna().astype(int)
+N = N.T @ N                                  # complete rows per pair
+
 results = []
-for xvar, yvar, title, fname in PAIRS:
-    sub = df[[xvar, yvar]].dropna()
-    rho, p = stats.spearmanr(sub[xvar], sub[yvar])
-    interp = interpret(rho, p, n=len(sub))
+for xvar, yvar, title, stem in PAIRS:
+    rho, p = RHO.loc[xvar, yvar], P.loc[xvar, yvar]
+    interp = interpret(rho, p, n=N.loc[xvar, yvar])
     print(f"{title:<35} {rho:>+7.3f} {p:>8.4f}  {interp}")
-    results.append((xvar, yvar, title, fname, rho, p, interp))
-    scatter_spearman(xvar, yvar, title, fname, rho, p)
+    results.append((xvar, yvar, title, stem, rho, p, interp))
+    scatter_spearman(xvar, yvar, title, stem, rho, p, SITE_GROUPS)
 
 print("-" * 90)
-print("\nNote: n=20 overall; subgroups may be smaller after dropna.")
+print("\nNote: n=20 overall; rows missing either variable of a pair are dropped.")
 print("All Spearman scatter plots saved to ./charts/")
 
 # ── Detailed narrative ─────────────────────────────────────────────────────────
 print("\n" + "=" * 65)
 print("DETAILED FINDINGS")
 print("=" * 65)
-for xvar, yvar, title, fname, rho, p, interp in results:
+for xvar, yvar, title, stem, rho, p, interp in results:
     print(f"\n[{title}]")
     print(f"  ρ = {rho:+.3f}, p = {p:.4f}")
     print(f"  → {interp}")
@@ -21,31 +21,23 @@ Run AFTER create_clean_csv.py
 import os, warnings
 import pandas as pd
 import numpy as np
+from _output import say, flush, save   # also selects Agg + the shared rcParams
 import matplotlib.pyplot as plt
-from scipy import stats
+from matplotlib.lines import Line2D
+from _stats import fit1
+from _stats_cache import cached_spearman
 
 warnings.filterwarnings("ignore")
 
 BASE   = os.path.dirname(__file__)
 CSV    = os.path.join(BASE, "survey_clean.csv")
-OUTDIR = os.path.join(BASE, "charts")
-os.makedirs(OUTDIR, exist_ok=True)
 
 df = pd.read_csv(CSV)
 
-plt.rcParams.update({
-    "font.family": "DejaVu Sans",
-    "font.size":   11,
-    "axes.spines.top":   False,
-    "axes.spines.right": False,
-})
-
-def save(name):
-    p = os.path.join(OUTDIR, name)
-    plt.tight_layout()
-    plt.savefig(p, dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  ✓  {name}")
+# One Figure per chart shape, allocated up front and cleared by save()
+fig_2x2 = plt.figure(figsize=(13, 10))
+fig_bar = plt.figure(figsize=(9, 4.5))
+fig_1x2 = plt.figure(figsize=(13, 5))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -71,32 +63,46 @@ SITE_COLORS = {
     "Bras Basah Complex": "#f28e2b",
 }
 
-print("=" * 60)
-print("SECTION A — SPEARMAN CORRELATIONS")
-print("=" * 60)
+say("=" * 60)
+say("SECTION A — SPEARMAN CORRELATIONS")
+say("=" * 60)
 
 rho_records = []
 
+# Every ρ / p for PAIRS in one batch (reused from spearman_cache.json when the data is unchanged)
+corr_cols = ["Q4_noise_rating", "Q7_concentration", "Q11_QoL", "Q8_air_quality", "Q10_community"]
+SPEARMAN  = cached_spearman(df, [(xv, yv) for xv, yv, *_ in PAIRS])
+
+# Plot data as plain arrays, sliced per pair instead of a dropna() copy each
+VALS    = df[corr_cols].to_numpy(dtype=float)
+VALID   = np.isfinite(VALS)
+COL_IDX = {c: i for i, c in enumerate(corr_cols)}
+SITE_C  = df["site"].map(SITE_COLORS).fillna("#aaa").to_numpy()
+
+# One scatter call per subplot, so the legend is built from proxy markers
+SITE_HANDLES = [Line2D([0], [0], marker="o", color="w", markerfacecolor=c,
+                       markersize=8, alpha=0.85, label=s)
+                for s, c in SITE_COLORS.items()]
+
 # ── 4 scatter plots in a 2×2 grid ──────────────────────────────────────────
-fig, axes = plt.subplots(2, 2, figsize=(13, 10))
-axes = axes.flatten()
+axes = fig_2x2.subplots(2, 2).flatten()
 
 for idx, (xv, yv, xlbl, ylbl, grp, col) in enumerate(PAIRS):
     ax = axes[idx]
-    sub = df[[xv, yv, "site"]].dropna()
-    rho, p = stats.spearmanr(sub[xv], sub[yv])
+    i, j = COL_IDX[xv], COL_IDX[yv]
+    m    = VALID[:, i] & VALID[:, j]
+    x, y = VALS[m, i], VALS[m, j]
+    rho, p = SPEARMAN[xv, yv]
     sig_str = "p < 0.001" if p < 0.001 else (f"p = {p:.3f}" + (" ✓" if p < 0.05 else " (ns)"))
 
     # scatter, coloured by site
-    for site, grpdf in sub.groupby("site"):
-        ax.scatter(grpdf[xv], grpdf[yv],
-                   color=SITE_COLORS.get(site, "#aaa"), s=65,
-                   alpha=0.85, edgecolors="white", lw=0.5, label=site)
+    ax.scatter(x, y, c=SITE_C[m], s=65,
+               alpha=0.85, edgecolors="white", lw=0.5)
 
     # trend line
-    z  = np.polyfit(sub[xv], sub[yv], 1)
-    xs = np.linspace(sub[xv].min() - 0.2, sub[xv].max() + 0.2, 200)
-    ax.plot(xs, np.polyval(z, xs), "--", color="#444", lw=1.4, alpha=0.65)
+    slope, icept = fit1(x, y)
+    xs = np.array([x.min() - 0.2, x.max() + 0.2])   # a straight line needs two points
+    ax.plot(xs, slope * xs + icept, "--", color="#444", lw=1.4, alpha=0.65)
 
     # annotation
     ax.text(0.97, 0.05,
@@ -125,32 +131,26 @@ for idx, (xv, yv, xlbl, ylbl, grp, col) in enumerate(PAIRS):
 
     # legend only on first plot
     if idx == 0:
-        ax.legend(loc="upper left", fontsize=7.5, framealpha=0.7)
+        ax.legend(handles=SITE_HANDLES, loc="upper left", fontsize=7.5, framealpha=0.7)
 
-    print(f"  [{grp}]  {xlbl} ↔ {ylbl}")
-    print(f"         ρ = {rho:+.3f}   {sig_str}")
+    say(f"  [{grp}]  {xlbl} ↔ {ylbl}")
+    say(f"         ρ = {rho:+.3f}   {sig_str}")
     rho_records.append((f"{xlbl}\n↔ {ylbl}", grp, rho, p, col))
 
-plt.suptitle("Correlation Scatter Plots\n(Spearman ρ — coloured by site)",
-             fontsize=13, fontweight="bold", y=1.01)
-save("A_correlations_scatter.png")
+fig_2x2.suptitle("Correlation Scatter Plots\n(Spearman ρ — coloured by site)",
+                 fontsize=13, fontweight="bold")
+save("A_correlations_scatter.png", fig_2x2)
 
 
 # ── ρ magnitude comparison bar (the "noise wins" chart) ─────────────────────
-fig, ax = plt.subplots(figsize=(9, 4.5))
-
-labels_r = [r[0] for r in rho_records]
-rhos_r   = [abs(r[2]) for r in rho_records]   # magnitude
-ps_r     = [r[3] for r in rho_records]
-cols_r   = [r[4] for r in rho_records]
-grps_r   = [r[1] for r in rho_records]
+ax = fig_bar.subplots()
 
-order = sorted(range(len(rhos_r)), key=lambda i: rhos_r[i], reverse=True)
-labels_r = [labels_r[i] for i in order]
-rhos_r   = [rhos_r[i]   for i in order]
-ps_r     = [ps_r[i]     for i in order]
-cols_r   = [cols_r[i]   for i in order]
-grps_r   = [grps_r[i]   for i in order]
+# Sort by |ρ| descending; a stable sort keeps PAIRS order on ties
+rec     = np.array(rho_records, dtype=object)
+abs_rho = np.abs(rec[:, 2].astype(float))     # magnitude
+order   = np.argsort(-abs_rho, kind="stable")
+labels_r, grps_r, _, ps_r, cols_r = (list(c) for c in rec[order].T)
+rhos_r  = abs_rho[order]
 
 bars = ax.barh(labels_r, rhos_r, color=cols_r, edgecolor="white", height=0.5)
 for bar, rho_v, p_v, grp in zip(bars, rhos_r, ps_r, grps_r):
@@ -167,17 +167,17 @@ ax.set_title("Correlation Magnitude Comparison\n"
 ax.axvline(0.5, color="grey", lw=1, linestyle="--", alpha=0.5, label="ρ = 0.5 reference")
 ax.legend(fontsize=9, framealpha=0.5)
 ax.invert_yaxis()
-save("A_rho_magnitude_comparison.png")
+save("A_rho_magnitude_comparison.png", fig_bar)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SECTION B — INDIVIDUAL DISTRIBUTIONS (no natural pairing)
 # ═══════════════════════════════════════════════════════════════════════════
-print("\n" + "=" * 60)
-print("SECTION B — INDIVIDUAL DISTRIBUTIONS")
-print("=" * 60)
+say("\n" + "=" * 60)
+say("SECTION B — INDIVIDUAL DISTRIBUTIONS")
+say("=" * 60)
 
-fig, axes = plt.subplots(1, 2, figsize=(13, 5))
+axes = fig_1x2.subplots(1, 2)
 
 # ── B1: Q5 Main noise sources ───────────────────────────────────────────────
 ax = axes[0]
@@ -187,11 +187,9 @@ source_map = {
     "Commercial Events":          "Commercial Events\n(Busking, Festivals)",
     "Construction / Renovation":  "Construction /\nRenovation",
 }
-counts = {lbl: 0 for lbl in source_map.values()}
-for src in df["Q5_noise_sources"]:
-    for key, lbl in source_map.items():
-        if key.lower() in str(src).lower():
-            counts[lbl] += 1
+s_lower = df["Q5_noise_sources"].fillna("").str.lower()
+counts = {lbl: int(s_lower.str.contains(key.lower(), regex=False, na=False).sum())
+          for key, lbl in source_map.items()}
 
 pairs_b1 = sorted(counts.items(), key=lambda x: x[1])
 lbls_b1, vals_b1 = zip(*pairs_b1)
@@ -201,7 +199,7 @@ ax.set_xlim(0, max(vals_b1) + 3)
 ax.set_xlabel("Number of Respondents (multi-select)")
 ax.set_title("[Noise]  Q5 — Main Noise Sources\n(n=20, multi-select)",
              fontweight="bold", color="#e15759")
-print(f"  Q5 noise sources: {dict(zip(lbls_b1, vals_b1))}")
+say(f"  Q5 noise sources: {dict(zip(lbls_b1, vals_b1))}")
 
 # ── B2: Q6 Noise spike ─────────────────────────────────────────────────────
 ax = axes[1]
@@ -215,22 +213,24 @@ ax.set_ylim(0, spike_counts.max() + 4)
 ax.set_ylabel("Number of Respondents")
 ax.set_title("[Noise]  Q6 — Does Noise Spike at Specific Times?\n(n=20)",
              fontweight="bold", color="#e15759")
-print(f"  Q6 spike: Yes={spike_counts[1]}, No={spike_counts[0]}")
+say(f"  Q6 spike: Yes={spike_counts[1]}, No={spike_counts[0]}")
 
-save("B_individual_distributions.png")
+save("B_individual_distributions.png", fig_1x2)
 
 
 # ── Console summary ─────────────────────────────────────────────────────────
-print("\n" + "=" * 60)
-print("RESULT SUMMARY")
-print("=" * 60)
+say("\n" + "=" * 60)
+say("RESULT SUMMARY")
+say("=" * 60)
 for lbl, grp, rho, p, _ in sorted(rho_records, key=lambda x: -abs(x[2])):
     sig = "✓ SIGNIFICANT" if p < 0.05 else "not significant"
-    print(f"  [{grp}]  ρ={rho:+.3f}  {sig}   {lbl.replace(chr(10),' ')}")
+    say(f"  [{grp}]  ρ={rho:+.3f}  {sig}   {lbl.replace(chr(10),' ')}")
 
-print("""
+say("""
 Charts saved to ./charts/:
   A_correlations_scatter.png       — 4 scatter plots, one per pair
   A_rho_magnitude_comparison.png   — bar chart comparing all ρ magnitudes
   B_individual_distributions.png   — Q5 noise sources + Q6 spike
 """)
+
+flush()
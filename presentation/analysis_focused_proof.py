@@ -24,32 +24,24 @@ Run AFTER create_clean_csv.py
 import os, warnings
 import pandas as pd
 import numpy as np
+from _output import say, flush, save   # also selects Agg + the shared rcParams
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-from scipy import stats
+from matplotlib.lines import Line2D
+from _stats import fit1
+from _stats_cache import cached_spearman
 
 warnings.filterwarnings("ignore")
 
 BASE   = os.path.dirname(__file__)
 CSV    = os.path.join(BASE, "survey_clean.csv")
-OUTDIR = os.path.join(BASE, "charts")
-os.makedirs(OUTDIR, exist_ok=True)
 
 df = pd.read_csv(CSV)
 
-plt.rcParams.update({
-    "font.family": "DejaVu Sans",
-    "font.size":   11,
-    "axes.spines.top":   False,
-    "axes.spines.right": False,
-})
-
-def save(name):
-    p = os.path.join(OUTDIR, name)
-    plt.tight_layout()
-    plt.savefig(p, dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  ✓  Saved {name}")
+# One Figure per chart shape, allocated up front and cleared by save();
+# Proofs 1 and 3 share the 1×2 canvas
+fig_1x2 = plt.figure(figsize=(13, 5))
+fig_bar = plt.figure(figsize=(8, 4))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -57,36 +49,36 @@ def save(name):
 #   Noise Q4:     already 1–10 (higher = louder = worse)             → direct
 #   Air Q8:       1–10 (higher = better) → invert: burden = 11 – Q8
 #   Community Q10: 0/1/2 (higher = more connected = POSITIVE)
-#                  burden = scale to 0–10 then invert: (2–Q10)/2*10
+#                  burden = scale to 0–10 then invert: (2–Q10)/2*10 = (2–Q10)*5
+# float32 is plenty for a 0–10 scale and halves what the rank passes read.
 # ─────────────────────────────────────────────────────────────────────────────
-df["noise_burden"]     = df["Q4_noise_rating"]              # 1–10 (high = bad)
-df["air_burden"]       = 11 - df["Q8_air_quality"]          # inverted (high = bad)
-df["community_burden"] = (2 - df["Q10_community"]) / 2 * 10 # inverted (high = isolated)
+df = df.assign(
+    noise_burden     = df["Q4_noise_rating"].astype("float32"),               # 1–10 (high = bad)
+    air_burden       = (11 - df["Q8_air_quality"]).astype("float32"),         # inverted (high = bad)
+    community_burden = ((2 - df["Q10_community"]) * 5.0).astype("float32"),   # inverted (high = isolated)
+)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # PROOF 1  —  Raw Burden Comparison (all 20 respondents)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-print("=" * 62)
-print("PROOF 1 — RAW BURDEN LEVELS (0–10 scale, higher = worse)")
-print("=" * 62)
-
-burden_means = {
-    "Noise\n(Q4)":          df["noise_burden"].mean(),
-    "Poor Air Quality\n(inverted Q8)": df["air_burden"].mean(),
-    "Lack of Community\n(inverted Q10)": df["community_burden"].mean(),
-}
+say("=" * 62)
+say("PROOF 1 — RAW BURDEN LEVELS (0–10 scale, higher = worse)")
+say("=" * 62)
+
+factor_cols = ["noise_burden", "air_burden", "community_burden"]
+burden_lbls = ["Noise\n(Q4)", "Poor Air Quality\n(inverted Q8)", "Lack of Community\n(inverted Q10)"]
+
+# Means and "% rated ≥7" for all three factors in one pass each
+means    = df[factor_cols].mean()
+high_pct = (df[factor_cols] >= 7).mean() * 100
+burden_means = dict(zip(burden_lbls, means))
 
-for k, v in burden_means.items():
-    pct_high = (df[{
-        "Noise\n(Q4)": "noise_burden",
-        "Poor Air Quality\n(inverted Q8)": "air_burden",
-        "Lack of Community\n(inverted Q10)": "community_burden"
-    }[k]] >= 7).mean() * 100
-    print(f"  {k.replace(chr(10),' '):<35}  mean={v:.2f}/10   {pct_high:.0f}% rated ≥7")
+for col, lbl in zip(factor_cols, burden_lbls):
+    say(f"  {lbl.replace(chr(10),' '):<35}  mean={means[col]:.2f}/10   {high_pct[col]:.0f}% rated ≥7")
 
 # Chart: grouped bar of means + individual dots
-fig, axes = plt.subplots(1, 2, figsize=(13, 5))
+axes = fig_1x2.subplots(1, 2)
 
 # — Left: Mean burden bars —
 ax = axes[0]
@@ -103,17 +95,18 @@ ax.legend(fontsize=9, framealpha=0.5)
 
 # — Right: Individual respondent burden dot-plot —
 ax2 = axes[1]
-factor_cols = ["noise_burden", "air_burden", "community_burden"]
 factor_lbls = ["Noise", "Poor Air", "Lack of\nCommunity"]
 x_positions = [1, 2, 3]
 
+# Same jitter pattern for every factor (as before), drawn once
+jitter = np.random.default_rng(42).uniform(-0.12, 0.12, len(df))
+
 for xi, (col, lbl, col_color) in enumerate(zip(factor_cols, factor_lbls, colors)):
-    jitter = np.random.default_rng(42).uniform(-0.12, 0.12, len(df))
     ax2.scatter(np.full(len(df), x_positions[xi]) + jitter,
                 df[col], color=col_color, s=55, alpha=0.8,
                 edgecolors="white", lw=0.5, zorder=3)
     ax2.plot([x_positions[xi]-0.25, x_positions[xi]+0.25],
-             [df[col].mean(), df[col].mean()],
+             [means[col], means[col]],
              color="black", lw=2.5, zorder=4)
 
 ax2.set_xticks(x_positions)
@@ -123,7 +116,7 @@ ax2.set_ylabel("Burden Score (0–10)")
 ax2.set_title("Proof 1b — Individual Respondent Scores\n(bar = mean)", fontweight="bold")
 ax2.axhline(5, color="grey", lw=1, linestyle="--", alpha=0.5)
 
-save("proof_1_raw_burden_comparison.png")
+save("proof_1_raw_burden_comparison.png", fig_1x2)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -131,10 +124,10 @@ save("proof_1_raw_burden_comparison.png")
 #   Spearman ρ between each burden and Q11_QoL (1=Improves, 4=Reduces)
 #   Higher ρ → stronger link between that burden and lower QoL
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-print("\n" + "=" * 62)
-print("PROOF 2 — SPEARMAN CORRELATION WITH QoL DAMAGE")
-print("  (Q11 encoded: 1=Improves, 4=Reduces — higher ρ = more damage)")
-print("=" * 62)
+say("\n" + "=" * 62)
+say("PROOF 2 — SPEARMAN CORRELATION WITH QoL DAMAGE")
+say("  (Q11 encoded: 1=Improves, 4=Reduces — higher ρ = more damage)")
+say("=" * 62)
 
 corr_pairs = [
     ("noise_burden",     "Q11_QoL", "Noise Burden",          "#e15759"),
@@ -142,34 +135,29 @@ corr_pairs = [
     ("community_burden", "Q11_QoL", "Lack of Community",     "#59a14f"),
 ]
 
+# All Proof 2 correlations (plus the Q4↔Q7 mechanism check) in one batch,
+# reused from spearman_cache.json when the data is unchanged
+SPEARMAN = cached_spearman(df, [(x, y) for x, y, *_ in corr_pairs]
+                               + [("Q4_noise_rating", "Q7_concentration")])
+
 rho_results = []
 for xvar, yvar, label, col in corr_pairs:
-    sub = df[[xvar, yvar]].dropna()
-    rho, p = stats.spearmanr(sub[xvar], sub[yvar])
+    rho, p = SPEARMAN[xvar, yvar]
     sig = "p<0.05 ✓" if p < 0.05 else f"p={p:.3f} (ns)"
-    print(f"  {label:<28}  ρ={rho:+.3f}  {sig}")
+    say(f"  {label:<28}  ρ={rho:+.3f}  {sig}")
     rho_results.append((label, rho, p, col))
 
 # Reference correlation also for Q4↔Q7 (noise → rest quality mechanism)
-sub_mech = df[["Q4_noise_rating","Q7_concentration"]].dropna()
-rho_mech, p_mech = stats.spearmanr(sub_mech["Q4_noise_rating"],
-                                    sub_mech["Q7_concentration"])
+rho_mech, p_mech = SPEARMAN["Q4_noise_rating", "Q7_concentration"]
 sig_mech = "p<0.05 ✓" if p_mech < 0.05 else f"p={p_mech:.3f} (ns)"
-print(f"\n  Mechanism check (Q4↔Q7 Rest/Concentration):  ρ={rho_mech:+.3f}  {sig_mech}")
+say(f"\n  Mechanism check (Q4↔Q7 Rest/Concentration):  ρ={rho_mech:+.3f}  {sig_mech}")
 
 # Chart: horizontal bar of ρ values — the "which factor wins" chart
-fig, ax = plt.subplots(figsize=(8, 4))
-labels_r = [r[0] for r in rho_results]
-rhos     = [r[1] for r in rho_results]
-ps       = [r[2] for r in rho_results]
-cols_r   = [r[3] for r in rho_results]
-
-# Sort by rho descending
-order = sorted(range(len(rhos)), key=lambda i: rhos[i], reverse=True)
-labels_r = [labels_r[i] for i in order]
-rhos     = [rhos[i]     for i in order]
-ps       = [ps[i]       for i in order]
-cols_r   = [cols_r[i]   for i in order]
+ax = fig_bar.subplots()
+# Sort by signed ρ descending; a stable sort keeps corr_pairs order on ties
+rec   = np.array(rho_results, dtype=object)
+order = np.argsort(-rec[:, 1].astype(float), kind="stable")
+labels_r, rhos, ps, cols_r = (list(c) for c in rec[order].T)
 
 bars = ax.barh(labels_r, rhos, color=cols_r, edgecolor="white", height=0.45)
 for bar, rho_v, p_v in zip(bars, rhos, ps):
@@ -187,7 +175,7 @@ ax.set_title("Proof 2 — Which Factor Damages QoL the Most?\n"
              "(higher ρ = stronger link to reduced QoL)",
              fontweight="bold")
 ax.invert_yaxis()
-save("proof_2_correlation_ranking.png")
+save("proof_2_correlation_ranking.png", fig_bar)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -196,9 +184,9 @@ save("proof_2_correlation_ranking.png")
 #   Split by site so you can see which sites are worst
 #   + table of raw respondents who said noise "Severely affects rest"
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-print("\n" + "=" * 62)
-print("PROOF 3 — MECHANISM: HIGH NOISE → POOR REST / CONCENTRATION")
-print("=" * 62)
+say("\n" + "=" * 62)
+say("PROOF 3 — MECHANISM: HIGH NOISE → POOR REST / CONCENTRATION")
+say("=" * 62)
 
 SITE_COLORS = {
     "Waterloo Centre":    "#4e79a7",
@@ -207,25 +195,29 @@ SITE_COLORS = {
     "Bras Basah Complex": "#f28e2b",
 }
 
+# The scatter is a single call, so its legend is built from proxy markers
+SITE_HANDLES = [Line2D([0], [0], marker="o", color="w", markerfacecolor=c,
+                       markersize=8.5, alpha=0.88, label=s)
+                for s, c in SITE_COLORS.items()]
+
 Q7_LABELS = {1:"Not at all", 2:"Neutral", 3:"Slightly",
              4:"Moderately", 5:"Highly", 6:"Severely affects rest"}
 
-fig, axes = plt.subplots(1, 2, figsize=(13, 5))
+axes = fig_1x2.subplots(1, 2)
 
 # — Left: scatter Q4 vs Q7, coloured by site —
 ax = axes[0]
-for site, grp in df.groupby("site"):
-    ax.scatter(grp["Q4_noise_rating"], grp["Q7_concentration"],
-               color=SITE_COLORS.get(site, "grey"), s=75,
-               alpha=0.88, edgecolors="white", lw=0.5, label=site)
+ax.scatter(df["Q4_noise_rating"], df["Q7_concentration"],
+           c=df["site"].map(SITE_COLORS).fillna("grey").to_numpy(), s=75,
+           alpha=0.88, edgecolors="white", lw=0.5)
 
 # Best-fit line
 x_all = df["Q4_noise_rating"].dropna()
 y_all = df["Q7_concentration"].dropna()
 common = df[["Q4_noise_rating","Q7_concentration"]].dropna()
-z = np.polyfit(common["Q4_noise_rating"], common["Q7_concentration"], 1)
-xs = np.linspace(x_all.min()-0.2, x_all.max()+0.2, 200)
-ax.plot(xs, np.polyval(z, xs), "--", color="#333333", lw=1.5, alpha=0.7)
+slope, icept = fit1(common["Q4_noise_rating"], common["Q7_concentration"])
+xs = np.array([x_all.min()-0.2, x_all.max()+0.2])   # a straight line needs two points
+ax.plot(xs, slope * xs + icept, "--", color="#333333", lw=1.5, alpha=0.7)
 
 ax.text(0.97, 0.05,
         f"Spearman ρ = {rho_mech:+.3f}\n{sig_mech}",
@@ -238,7 +230,7 @@ ax.set_xlabel("Q4 Noise Rating (1=Quiet → 10=Loud)")
 ax.set_ylabel("Q7 Concentration/Rest Impact\n(1=Not at all → 6=Severely affects rest)")
 ax.set_title("Proof 3a — Noise Level vs Rest Impact\n(Spearman, coloured by site)",
              fontweight="bold")
-ax.legend(loc="upper left", fontsize=8, framealpha=0.7)
+ax.legend(handles=SITE_HANDLES, loc="upper left", fontsize=8, framealpha=0.7)
 ax.set_xticks(range(1, 11))
 ax.set_yticks(range(1, 7))
 ax.set_yticklabels([Q7_LABELS[i] for i in range(1, 7)], fontsize=8)
@@ -253,8 +245,12 @@ sites = ["Waterloo Centre", "Cheng Yan Court", "Albert Centre", "Bras Basah Comp
 q7_vals = list(range(1, 7))
 bottom = np.zeros(len(sites))
 
+# Site × Q7 counts in one pass, rather than a boolean mask per cell
+ct = pd.crosstab(df["site"], df["Q7_concentration"]).reindex(
+    index=sites, columns=q7_vals, fill_value=0)
+
 for q7v in q7_vals:
-    counts = [len(df[(df["site"]==s) & (df["Q7_concentration"]==q7v)]) for s in sites]
+    counts = ct[q7v].values.tolist()
     ax2.bar(sites, counts, bottom=bottom, color=q7_colors_map[q7v],
             label=Q7_LABELS[q7v], edgecolor="white", width=0.55)
     bottom += np.array(counts)
@@ -265,22 +261,24 @@ ax2.set_ylabel("Number of Respondents")
 ax2.legend(loc="upper right", fontsize=7.5, framealpha=0.7, title="Q7 Impact Level")
 plt.setp(ax2.get_xticklabels(), rotation=12, ha="right")
 
-save("proof_3_noise_to_rest_mechanism.png")
+save("proof_3_noise_to_rest_mechanism.png", fig_1x2)
 
 # ── Raw respondents who say noise severely affects rest ──────────────────────
-severe = df[df["Q7_concentration"] >= 5][
-    ["respondent_id","site","Q4_noise_rating","Q7_concentration_raw","Q11_QoL_raw"]
-].copy()
+# Q7 ≥ 5 (Highly / Severely)
+mask_severe = df["Q7_concentration"].ge(5).to_numpy()
+severe = df.loc[mask_severe,
+                ["respondent_id","site","Q4_noise_rating","Q7_concentration_raw","Q11_QoL_raw"]]
 severe.columns = ["ID","Site","Q4 Noise","Q7 Impact","Q11 QoL"]
-print(f"\n  Respondents with HIGH rest impact (Q7 ≥ 5: Highly / Severely):")
-print(severe.to_string(index=False))
+say(f"\n  Respondents with HIGH rest impact (Q7 ≥ 5: Highly / Severely):")
+say(severe.to_string(index=False))
+flush()
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # SUMMARY STATEMENT
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-print("\n" + "=" * 62)
-print("SUMMARY — WHAT THE DATA PROVES")
-print("=" * 62)
+say("\n" + "=" * 62)
+say("SUMMARY — WHAT THE DATA PROVES")
+say("=" * 62)
 
 noise_mean     = df["noise_burden"].mean()
 air_mean       = df["air_burden"].mean()
@@ -288,7 +286,7 @@ comm_mean      = df["community_burden"].mean()
 noise_rho      = rho_results[0][1] if rho_results[0][0].startswith("Noise") else \
                  next(r[1] for r in rho_results if r[0].startswith("Noise"))
 
-print(f"""
+say(f"""
 1. EXPOSURE — Noise burden ({noise_mean:.1f}/10) is higher than poor air
    ({air_mean:.1f}/10) and lack of community ({comm_mean:.1f}/10).
    {(df['noise_burden']>=7).sum()}/{len(df)} respondents rated noise ≥7/10.
@@ -310,7 +308,9 @@ LIMITATION: n=20 (n=5 per site). All results are perceptual and
 indicative. No causation can be claimed from correlational data.
 """)
 
-print("3 proof charts saved to ./charts/")
-print("  proof_1_raw_burden_comparison.png")
-print("  proof_2_correlation_ranking.png")
-print("  proof_3_noise_to_rest_mechanism.png")
+say("3 proof charts saved to ./charts/")
+say("  proof_1_raw_burden_comparison.png")
+say("  proof_2_correlation_ranking.png")
+say("  proof_3_noise_to_rest_mechanism.png")
+
+flush()
@@ -1,14 +1,38 @@
 """
 create_clean_csv.py
-Generates survey_clean.csv from the raw Google Form export.
+Generates survey_clean.csv (plus a survey_clean.parquet mirror when pyarrow
+is installed) from the raw Google Form export, encoding whole columns at a
+time with pandas.
 Run this FIRST before any analysis scripts.
 """
 
-import csv, os
+import os
+import pandas as pd
+from _data import DTYPES
 
 RAW = os.path.join(os.path.dirname(__file__),
                    "Site Analysis Google form  - Sheet1.csv")
 OUT = os.path.join(os.path.dirname(__file__), "survey_clean.csv")
+OUT_PARQUET = os.path.join(os.path.dirname(__file__), "survey_clean.parquet")
+
+# ── Raw columns used (short name → Google Form header) ────────────────────────
+# Only these are parsed; the long free-text answers (existing solutions,
+# suggested solutions, reasons for Q8) are never loaded.
+RAW_COLS = {
+    "site":      "12. Which site do you live in?",
+    "age_raw":   "1. Which age group do you fall into?",
+    "dur_raw":   "2. How long have you lived in this estate?",
+    "floor_raw": "3. Which floor range is your unit located on?",
+    "q4":        "4. On a normal day, how would you rate the noise level from 1 to 10?",
+    "q5":        "5. What are the main noise sources you notice most often?",
+    "q6_raw":    "6. Does the noise ever spike during specific hours / events?",
+    "q7_raw":    "7. How does the noise level affect your ability to concentrate (studying, working)?",
+    "q8":        "8. How do you find the quality of air in your living area?",
+    "q9_raw":    "9. Convenience: When there are big festivals or religious practices, events etc, how does it affect your routine?",
+    "q10_raw":   "10. Does living so close to these cultural/religious hubs make you feel more connected to the community?",
+    "q11_raw":   "11. Overall, would you say living here improves or reduces your Quality of Life?",
+}
+RENAME = {header: short for short, header in RAW_COLS.items()}
 
 # ── Encoding maps ──────────────────────────────────────────────────────────────
 Q7_MAP = {
@@ -61,74 +85,79 @@ NOISE_SPIKE_MAP = {
 }  # anything non-"No" → 1
 
 
-def encode(val: str, mapping: dict, default=None):
-    return mapping.get(val.strip().lower(), default)
+def encode(col, mapping):
+    """Map a stripped text column through `mapping`, case-insensitively."""
+    return col.str.lower().map(mapping).astype("Int64")
+
+
+def to_int(col):
+    """Whole-number answers as integers; anything else becomes blank."""
+    return pd.to_numeric(col.where(col.str.isdigit()), errors="coerce").astype("Int64")
 
 
-def noise_spike(val: str) -> int:
-    return 0 if val.strip().lower() == "no" else 1
+def write_parquet(out):
+    """Mirror the cleaned rows as Parquet so the analysis scripts skip CSV parsing."""
+    tmp = OUT_PARQUET + ".tmp"
+    try:
+        out.astype(DTYPES).to_parquet(tmp, engine="pyarrow",
+                                      compression="zstd", index=False)
+        os.replace(tmp, OUT_PARQUET)   # never leave a half-written mirror behind
+    except ImportError:
+        print("   (pyarrow not installed — skipped survey_clean.parquet)")
+        return
+    except (ValueError, TypeError, OSError) as e:
+        # The CSV is already written; the analysis scripts fall back to it
+        # whenever the mirror is missing, older or unreadable.
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        print(f"   (could not mirror as Parquet — skipped survey_clean.parquet: {e})")
+        return
+    print(f"✓  Written {len(out)} rows → {OUT_PARQUET}")
 
 
 def main():
-    rows_out = []
-    with open(RAW, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for idx, row in enumerate(reader, start=1):
-            # Raw columns (strip to be safe)
-            site      = row["12. Which site do you live in?"].strip()
-            age_raw   = row["1. Which age group do you fall into?"].strip()
-            dur_raw   = row["2. How long have you lived in this estate?"].strip()
-            floor_raw = row["3. Which floor range is your unit located on?"].strip()
-            q4        = row["4. On a normal day, how would you rate the noise level from 1 to 10?"].strip()
-            q5        = row["5. What are the main noise sources you notice most often?"].strip()
-            q6_raw    = row["6. Does the noise ever spike during specific hours / events?"].strip()
-            q7_raw    = row["7. How does the noise level affect your ability to concentrate (studying, working)?"].strip()
-            q8        = row["8. How do you find the quality of air in your living area?"].strip()
-            q9_raw    = row["9. Convenience: When there are big festivals or religious practices, events etc, how does it affect your routine?"].strip()
-            q10_raw   = row["10. Does living so close to these cultural/religious hubs make you feel more connected to the community?"].strip()
-            q11_raw   = row["11. Overall, would you say living here improves or reduces your Quality of Life?"].strip()
-
-            rows_out.append({
-                "respondent_id":         idx,
-                "site":                  site,
-                "age_group":             age_raw,
-                "age_numeric":           encode(age_raw, AGE_MAP),
-                "residency_duration":    dur_raw,
-                "residency_numeric":     encode(dur_raw, DURATION_MAP),
-                "floor_level":           floor_raw,
-                "floor_numeric":         encode(floor_raw, FLOOR_MAP),
-                "Q4_noise_rating":       int(q4) if q4.isdigit() else None,
-                "Q5_noise_sources":      q5,
-                "Q6_noise_spike":        noise_spike(q6_raw),
-                "Q6_spike_raw":          q6_raw,
-                "Q7_concentration_raw":  q7_raw,
-                "Q7_concentration":      encode(q7_raw, Q7_MAP),
-                "Q8_air_quality":        int(q8) if q8.isdigit() else None,
-                "Q9_convenience_raw":    q9_raw,
-                "Q10_community_raw":     q10_raw,
-                "Q10_community":         encode(q10_raw, COMMUNITY_MAP),
-                "Q11_QoL_raw":           q11_raw,
-                "Q11_QoL":               encode(q11_raw, Q11_MAP),
-            })
-
-    fieldnames = list(rows_out[0].keys())
-    with open(OUT, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows_out)
-
-    print(f"✓  Written {len(rows_out)} rows → {OUT}")
+    # Everything as text, blanks as "" — the same view csv.DictReader gave
+    raw = (pd.read_csv(RAW, usecols=list(RAW_COLS.values()), dtype=str, keep_default_na=False)
+             .rename(columns=RENAME)
+             .apply(lambda c: c.str.strip()))
+
+    out = pd.DataFrame({
+        "respondent_id":         range(1, len(raw) + 1),
+        "site":                  raw["site"],
+        "age_group":             raw["age_raw"],
+        "age_numeric":           encode(raw["age_raw"], AGE_MAP),
+        "residency_duration":    raw["dur_raw"],
+        "residency_numeric":     encode(raw["dur_raw"], DURATION_MAP),
+        "floor_level":           raw["floor_raw"],
+        "floor_numeric":         encode(raw["floor_raw"], FLOOR_MAP),
+        "Q4_noise_rating":       to_int(raw["q4"]),
+        "Q5_noise_sources":      raw["q5"],
+        "Q6_noise_spike":        (raw["q6_raw"].str.lower() != "no").astype(int),   # anything non-"No" → 1
+        "Q6_spike_raw":          raw["q6_raw"],
+        "Q7_concentration_raw":  raw["q7_raw"],
+        "Q7_concentration":      encode(raw["q7_raw"], Q7_MAP),
+        "Q8_air_quality":        to_int(raw["q8"]),
+        "Q9_convenience_raw":    raw["q9_raw"],
+        "Q10_community_raw":     raw["q10_raw"],
+        "Q10_community":         encode(raw["q10_raw"], COMMUNITY_MAP),
+        "Q11_QoL_raw":           raw["q11_raw"],
+        "Q11_QoL":               encode(raw["q11_raw"], Q11_MAP),
+    })
+
+    out.to_csv(OUT, index=False)
+    print(f"✓  Written {len(out)} rows → {OUT}")
+    write_parquet(out)
 
     # ── Quick sanity check ─────────────────────────────────────────────────────
     print("\nSanity check — encoded values:")
     print(f"{'ID':>3}  {'Site':<22} {'Q4':>4} {'Q7':>4} {'Q8':>4} {'Q11':>4}")
     print("-" * 45)
-    for r in rows_out:
-        print(f"{r['respondent_id']:>3}  {r['site']:<22} "
-              f"{str(r['Q4_noise_rating']):>4} "
-              f"{str(r['Q7_concentration']):>4} "
-              f"{str(r['Q8_air_quality']):>4} "
-              f"{str(r['Q11_QoL']):>4}")
+    for r in out.itertuples(index=False):
+        print(f"{r.respondent_id:>3}  {r.site:<22} "
+              f"{str(r.Q4_noise_rating):>4} "
+              f"{str(r.Q7_concentration):>4} "
+              f"{str(r.Q8_air_quality):>4} "
+              f"{str(r.Q11_QoL):>4}")
 
 
 if __name__ == "__main__":
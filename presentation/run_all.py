@@ -0,0 +1,13 @@
+"""
+run_all.py
+Runs Scripts 1–3 back to back in a single Python process.
+
+Each script loads the survey through _data.get_df(), so running them here
+parses survey_clean.csv once instead of three times.
+
+Run AFTER create_clean_csv.py
+"""
+
+import analysis_1_descriptives
+import analysis_2_spearman
+import analysis_3_kruskal_fisher